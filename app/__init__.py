@@ -18,7 +18,17 @@ def create_app(test_config=None):
     # Configure the app
     app.config.from_mapping(
         SECRET_KEY='dev',  # Change this in production!
-        DEBUG=True
+        DEBUG=True,
+        # Per-session datasets: one CSV per workspace, deleted after the retention.
+        # The memory budget applies to each worker process, so with N gunicorn
+        # workers the total is N times this value.
+        WORKSPACE_DIR=os.environ.get('WORKSPACE_DIR', os.path.join('app', 'data', 'workspaces')),
+        WORKSPACE_MEMORY_BUDGET=int(os.environ.get('WORKSPACE_MEMORY_BUDGET', 64 * 1024 * 1024)),
+        WORKSPACE_RETENTION_DAYS=float(os.environ.get('WORKSPACE_RETENTION_DAYS', 7)),
+        # PDF cache size limit, also per worker process
+        PDF_CACHE_MAX_BYTES=int(os.environ.get('PDF_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+        # Base of the sheet export URL (point it at a stand-in server for load tests)
+        SHEETS_BASE_URL=os.environ.get('SHEETS_BASE_URL', 'https://docs.google.com')
     )
 
     if test_config is None:
@@ -28,6 +38,9 @@ def create_app(test_config=None):
         # Load the test config if passed in
         app.config.from_mapping(test_config)
 
+    from app import workspaces
+    workspaces.init_app(app)
+
     # Register blueprints
     from app.routes import main_bp
     app.register_blueprint(main_bp)
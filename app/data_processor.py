@@ -6,8 +6,9 @@ from io import StringIO
 import unicodedata
 import re
 import logging
-import os
-from app.utils import extract_id_from_url, normalize_text, find_column
+from flask import current_app
+from app.utils import extract_id_from_url, normalize_text, normalize_name, normalize_address, find_column
+from app.workspaces import get_store
 
 logger = logging.getLogger(__name__)
 
@@ -68,11 +69,73 @@ def clean_data(df):
 
     return data
 
-def process_sheet_data(url):
-    """Process data from Google Sheets URL"""
+def _first_names_agree(a, b):
+    """Same first name, or an initial ("A.") of it ("Ana")"""
+    return a == b or (len(a) == 1 and b.startswith(a)) or (len(b) == 1 and a.startswith(b))
+
+def _names_match(tokens_a, tokens_b):
+    """
+    Two names match if their first names agree and most of the shorter
+    name's remaining tokens (surnames) appear in the other one.
+    """
+    if not tokens_a or not tokens_b or not _first_names_agree(tokens_a[0], tokens_b[0]):
+        return False
+    resto_a, resto_b = set(tokens_a[1:]), set(tokens_b[1:])
+    if not resto_a or not resto_b:
+        return True
+    return len(resto_a & resto_b) * 3 >= min(len(resto_a), len(resto_b)) * 2
+
+def _split_address(address_key):
+    """Split a normalized address into building (street and number) and door"""
+    tokens = address_key.split()
+    for i, token in enumerate(tokens):
+        if token[0].isdigit():
+            return " ".join(tokens[:i + 1]), " ".join(tokens[i + 1:])
+    return address_key, ""
+
+def find_duplicates(df):
+    """
+    Flag likely duplicate subscribers.
+    Rows are blocked by CP and building (normalized street and number) through
+    a hash index, so each row is only compared with the few rows at the same
+    building instead of with every other row. A row is flagged when an earlier
+    row there has a matching name and the same door (or one of them has none).
+    Returns, for each row (in order), a description of the earlier row it
+    duplicates, or "" if none.
+    """
+    cps = df["CP"].fillna("").astype(str).str.strip()
+    address_keys = df["Dirección"].map(normalize_address)
+    name_keys = df["Nombre"].map(normalize_name)
+    nombres = df["Nombre"].fillna("").astype(str).tolist()
+    direcciones = df["Dirección"].fillna("").astype(str).tolist()
+
+    buildings = {}  # (CP, building) -> [(door, name tokens, row position)]
+    duplicados = [""] * len(df)
+
+    for pos, (cp, address_key, name_key) in enumerate(zip(cps, address_keys, name_keys)):
+        if not address_key or not name_key:
+            continue
+        building, door = _split_address(address_key)
+        tokens = name_key.split()
+        candidatos = buildings.setdefault((cp, building), [])
+
+        original = next((other for other_door, other_tokens, other in candidatos
+                         if (door == other_door or not door or not other_door)
+                         and _names_match(tokens, other_tokens)), None)
+        if original is not None:
+            duplicados[pos] = f"{nombres[original]} ({direcciones[original]})"
+
+        candidatos.append((door, tokens, pos))
+
+    logger.info(f"Posibles duplicados detectados: {sum(1 for d in duplicados if d)}")
+    return duplicados
+
+def process_sheet_data(url, workspace_id):
+    """Process data from Google Sheets URL into the given workspace"""
     sheet_id = extract_id_from_url(url)
 
-    sheet_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+    base_url = current_app.config.get("SHEETS_BASE_URL", "https://docs.google.com").rstrip("/")
+    sheet_url = f"{base_url}/spreadsheets/d/{sheet_id}/export?format=csv"
 
     try:
         response = requests.get(sheet_url)
@@ -97,24 +160,17 @@ def process_sheet_data(url):
         # Sort by product and zone
         df = df.sort_values(by=["Producto", "Zona"], na_position="last")
 
-        # Save to CSV
-        # Ensure data directory exists
-        data_dir = os.path.join('app', 'data')
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
+        # Save to the session workspace
+        get_store().save(workspace_id, df)
 
-        # Save to new location
-        csv_path = os.path.join(data_dir, 'datos_hoja.csv')
-        df.to_csv(csv_path, index=False)
-        logger.info(f"Datos guardados en {csv_path}")
-
-        return df.to_dict(orient="records")
+        # Duplicate flags are only shown in the preview, not stored
+        return df.assign(Duplicado=find_duplicates(df)).to_dict(orient="records")
     except Exception as e:
         logger.error(f"Error processing sheet data: {str(e)}", exc_info=True)
         raise
 
-def save_edited_data(data):
-    """Save edited data back to CSV"""
+def save_edited_data(data, workspace_id):
+    """Save edited data back to the workspace"""
     required_fields = [
         "Enviar", "Nombre", "Empresa", "Dirección", "CP", 
         "Ciudad", "Zona", "Producto", "País", "Internacional"
@@ -146,14 +202,7 @@ def save_edited_data(data):
     if "CP" in df.columns:
         df["CP"] = df["CP"].astype(str).apply(lambda x: x.zfill(5) if x and x.isdigit() and len(x) < 5 else x)
 
-    # Ensure data directory exists
-    data_dir = os.path.join('app', 'data')
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-
-    # Save to new location
-    csv_path = os.path.join(data_dir, 'datos_hoja.csv')
-    df.to_csv(csv_path, index=False)
-    logger.info(f"Datos editados guardados en {csv_path}")
+    get_store().save(workspace_id, df)
+    logger.info(f"Datos editados guardados en el espacio de trabajo {workspace_id}")
 
     return True
\ No newline at end of file
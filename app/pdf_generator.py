@@ -8,47 +8,56 @@ from reportlab.graphics.barcode import code128
 import logging
 import functools
 import os
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from flask import current_app
+from app.workspaces import get_store
 
 logger = logging.getLogger(__name__)
 
-# Simple caching mechanism
-_pdf_cache = {}
+# Simple caching mechanism (LRU bounded by size, per worker process)
+_pdf_cache = OrderedDict()  # key -> (timestamp, size, data)
 _cache_timeout = 300  # 5 minutes
+_cache_bytes = 0
+_cache_lock = threading.Lock()
 
 def _get_from_cache(key):
     """Get item from cache if valid"""
-    if key in _pdf_cache:
-        timestamp, data = _pdf_cache[key]
-        if time.time() - timestamp < _cache_timeout:
-            return data
+    with _cache_lock:
+        entry = _pdf_cache.get(key)
+        if entry and time.time() - entry[0] < _cache_timeout:
+            _pdf_cache.move_to_end(key)
+            return entry[2]
     return None
 
 def _add_to_cache(key, data):
-    """Add item to cache"""
-    _pdf_cache[key] = (time.time(), data)
-
-def _get_data_file_timestamp():
-    """Get timestamp of data file for cache invalidation"""
-    try:
-        data_file_path = os.path.join('app', 'data', 'datos_hoja.csv')
-        if not os.path.exists(data_file_path):
-            data_file_path = 'datos_hoja.csv'  # Fallback a la ubicación antigua
-
-        return os.path.getmtime(data_file_path)
-    except OSError:
-        logger.warning("No se encontró el archivo de datos")
-        return 0
+    """Add item to cache, dropping expired and least recently used entries"""
+    global _cache_bytes
+    now = time.time()
+    size = data.getbuffer().nbytes
+    max_bytes = current_app.config["PDF_CACHE_MAX_BYTES"]
+    with _cache_lock:
+        old = _pdf_cache.pop(key, None)
+        if old:
+            _cache_bytes -= old[1]
+        for old_key in [k for k, (timestamp, _, _) in _pdf_cache.items() if now - timestamp >= _cache_timeout]:
+            _cache_bytes -= _pdf_cache.pop(old_key)[1]
+        while _pdf_cache and _cache_bytes + size > max_bytes:
+            _cache_bytes -= _pdf_cache.popitem(last=False)[1][1]
+        if size <= max_bytes:
+            _pdf_cache[key] = (now, size, data)
+            _cache_bytes += size
 
 def pdf_cache(func):
     """Decorator for caching PDF generation"""
     @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        # Include offsets and guides in cache key
+    def wrapper(workspace_id, **kwargs):
+        # Include workspace data version, offsets and guides in cache key
         offsets_key = f"{kwargs.get('offset_x', 0)}_{kwargs.get('offset_y', 0)}_{kwargs.get('delta_w', 0)}_{kwargs.get('delta_h', 0)}_{kwargs.get('guides', False)}"
-        cache_key = f"{func.__name__}_{_get_data_file_timestamp()}_{offsets_key}"
+        data_version = get_store().version(workspace_id)
+        cache_key = f"{func.__name__}_{workspace_id}_{data_version}_{offsets_key}"
         cached_data = _get_from_cache(cache_key)
 
         if cached_data:
@@ -60,7 +69,7 @@ def pdf_cache(func):
             return buffer
 
         # Generate new PDF
-        buffer = func(*args, **kwargs)
+        buffer = func(workspace_id, **kwargs)
 
         # Cache a copy
         buffer_copy = BytesIO()
@@ -90,19 +99,9 @@ def _intentar_cargar_sello(internacional=False):
     logger.warning(f"No se encontró el archivo de sello: {sello_file}")
     return None
 
-def _read_data_file():
-    """Read data from CSV file handling different locations"""
-    posibles_rutas = [
-        os.path.join('app', 'data', 'datos_hoja.csv'),
-        'datos_hoja.csv'
-    ]
-
-    for ruta in posibles_rutas:
-        if os.path.exists(ruta):
-            logger.info(f"Leyendo datos desde: {ruta}")
-            return pd.read_csv(ruta, encoding="utf-8-sig", dtype=str).fillna("")
-
-    raise FileNotFoundError("No se encontró el archivo datos_hoja.csv")
+def _read_data_file(workspace_id):
+    """Read data of the given workspace"""
+    return get_store().load(workspace_id)
 
 def _dibujar_guias(c, x, y, w, h):
     """
@@ -127,7 +126,7 @@ def _dibujar_guias(c, x, y, w, h):
     c.restoreState()
 
 @pdf_cache
-def generate_address_labels(offset_x=0, offset_y=0, delta_w=0, delta_h=0, guides=False):
+def generate_address_labels(workspace_id, offset_x=0, offset_y=0, delta_w=0, delta_h=0, guides=False):
     """
     Generate address labels PDF.
     offset_x/y: Mueve todo el contenido (calibración impresora).
@@ -135,7 +134,7 @@ def generate_address_labels(offset_x=0, offset_y=0, delta_w=0, delta_h=0, guides
     guides: Dibuja la rejilla teórica fija.
     """
     try:
-        df = _read_data_file()
+        df = _read_data_file(workspace_id)
         df = df[df["Enviar"].astype(str).str.lower().isin(["true", "1", "sí", "si"])
                 & df["Nombre"].fillna("").str.strip().ne("")
                 & df["Dirección"].fillna("").str.strip().ne("")
@@ -255,14 +254,14 @@ def generate_address_labels(offset_x=0, offset_y=0, delta_w=0, delta_h=0, guides
         raise
 
 @pdf_cache
-def generate_or_labels(offset_x=0, offset_y=0, delta_w=0, delta_h=0, guides=False):
+def generate_or_labels(workspace_id, offset_x=0, offset_y=0, delta_w=0, delta_h=0, guides=False):
     """
     Generate OR labels.
     - Excludes international shipments.
     - Uses static guides and content padding.
     """
     try:
-        df = _read_data_file()
+        df = _read_data_file(workspace_id)
 
         # 1. Filtros básicos (Activos + Dirección completa)
         df = df[df["Enviar"].astype(str).str.lower().isin(["true", "1", "sí", "si"])]
@@ -3,6 +3,7 @@ import logging
 from flask import Blueprint, render_template, request, send_file, jsonify
 from app.data_processor import process_sheet_data, save_edited_data
 from app.pdf_generator import generate_address_labels, generate_or_labels
+from app.workspaces import current_workspace_id
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +19,7 @@ def index():
 
         try:
             # Process the spreadsheet data
-            preview = process_sheet_data(url)
+            preview = process_sheet_data(url, current_workspace_id())
             return render_template("index.html",
                                    success="Datos cargados correctamente",
                                    preview=preview)
@@ -37,7 +38,7 @@ def editar():
         return jsonify({"ok": False, "error": "No se recibieron datos"}), 400
 
     try:
-        save_edited_data(datos)
+        save_edited_data(datos, current_workspace_id())
         return jsonify({"ok": True})
     except Exception as e:
         logger.error(f"Error saving data: {str(e)}", exc_info=True)
@@ -54,6 +55,7 @@ def generar_pdf():
         guides = request.args.get("guides", "0") == "1"
 
         buffer = generate_address_labels(
+            current_workspace_id(),
             offset_x=offset_x, 
             offset_y=offset_y,
             delta_w=delta_w,
@@ -73,7 +75,7 @@ def generar_etiquetas_or():
     """Generate OR labels PDF (Fixed standard layout)"""
     try:
         # OR Labels do not use calibration parameters
-        buffer = generate_or_labels()
+        buffer = generate_or_labels(current_workspace_id())
         return send_file(buffer,
                          mimetype="application/pdf",
                          as_attachment=False,
@@ -32,4 +32,53 @@ def find_column(possible_names, normalized_columns):
             if possible_norm in col_norm:
                 logger.info(f"Campo '{possible}' detectado como → '{col_real}'")
                 return col_real
-    return None
\ No newline at end of file
+    return None
+
+# Street types and filler words folded when comparing addresses
+_STREET_TYPES = {
+    "c": "calle", "cl": "calle", "cll": "calle", "calle": "calle",
+    "av": "avenida", "avd": "avenida", "avda": "avenida", "avenida": "avenida",
+    "pl": "plaza", "pz": "plaza", "pza": "plaza", "plaza": "plaza",
+    "p": "paseo", "po": "paseo", "pso": "paseo", "paseo": "paseo",
+    "rd": "ronda", "rda": "ronda", "ronda": "ronda",
+    "ctra": "carretera", "crta": "carretera", "carretera": "carretera",
+    "cm": "camino", "cmno": "camino", "camino": "camino",
+    "tr": "travesia", "trva": "travesia", "trav": "travesia", "travesia": "travesia",
+    "gta": "glorieta", "glorieta": "glorieta",
+    "urb": "urbanizacion", "urbanizacion": "urbanizacion",
+    "izq": "izquierda", "izqda": "izquierda", "izda": "izquierda", "izquierda": "izquierda",
+    "dcha": "derecha", "dch": "derecha", "drcha": "derecha", "derecha": "derecha"
+}
+_ADDRESS_FILLERS = {"de", "del", "la", "el", "los", "las", "n", "no", "num", "numero", "piso", "puerta"}
+
+def _fold_accents(text):
+    """Strip accents and ordinal marks before normalize_text (which drops accented letters)"""
+    text = re.sub(r"[ºª°]", " ", str(text))
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+def normalize_name(text):
+    """Normalize person name for duplicate detection"""
+    return normalize_text(_fold_accents(text))
+
+def normalize_address(text):
+    """Normalize address for duplicate detection (folds street abbreviations)"""
+    # "3 A" and "3A" are the same door; merge before any abbreviation lookup
+    # so doors like "2º C" or "1º P" are not read as "calle" or "paseo"
+    merged = []
+    for token in normalize_text(_fold_accents(text)).split():
+        if len(token) == 1 and token.isalpha() and merged and merged[-1].isdigit():
+            merged[-1] += token
+        else:
+            merged.append(token)
+
+    tokens = []
+    for i, token in enumerate(merged):
+        folded = _STREET_TYPES.get(token, token)
+        # Single letters are only a street type at the start; elsewhere they
+        # are initials inside the street name ("C/ P. Picasso")
+        if len(token) == 1 and i > 0:
+            folded = token
+        if folded in _ADDRESS_FILLERS:
+            continue
+        tokens.append(folded)
+    return " ".join(tokens)
@@ -0,0 +1,172 @@
+# app/workspaces.py - Per-session dataset storage
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import pandas as pd
+from flask import current_app, session
+
+logger = logging.getLogger(__name__)
+
+_WORKSPACE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+# Files the store owns: <id>.csv and its temporary <id>.csv.<pid>.<tid>.tmp
+_WORKSPACE_FILE_RE = re.compile(r"^([0-9a-f]{32})\.csv(\.\d+\.\d+\.tmp)?$")
+
+def _file_version(st):
+    """
+    Version of a workspace file. The mtime alone can repeat for two writes in
+    the same clock tick, but every save renames a new file, so the inode
+    changes on each write.
+    """
+    return f"{st.st_mtime_ns}-{st.st_ino}-{st.st_size}"
+
+class WorkspaceStore:
+    """
+    Datasets keyed by workspace id.
+    Every save is written to disk (one CSV per workspace), so the disk copy is
+    the source of truth shared by all workers. Loaded frames are kept in memory
+    under a budget that applies to each worker process; the least recently used
+    ones are dropped first and reloaded from disk transparently on the next
+    access. Workspaces not saved for `retention` seconds are deleted from disk.
+    """
+
+    def __init__(self, data_dir, memory_budget, retention):
+        self.data_dir = data_dir
+        self.memory_budget = memory_budget
+        self.retention = retention
+        self._entries = OrderedDict()  # workspace_id -> (version, size, df)
+        self._used = 0
+        self._last_purge = 0
+        self._lock = threading.Lock()
+
+    def path(self, workspace_id):
+        """Path of the CSV backing a workspace"""
+        if not _WORKSPACE_ID_RE.match(str(workspace_id)):
+            raise ValueError("Identificador de espacio de trabajo no válido")
+        return os.path.join(self.data_dir, f"{workspace_id}.csv")
+
+    def version(self, workspace_id):
+        """Version stamp of the workspace data (0 if there is none)"""
+        try:
+            return _file_version(os.stat(self.path(workspace_id)))
+        except OSError:
+            return 0
+
+    def load(self, workspace_id):
+        """Return a copy of the workspace data, reading from disk if needed"""
+        version = self.version(workspace_id)
+        if not version:
+            raise FileNotFoundError("No hay datos cargados en esta sesión. Carga primero una hoja.")
+
+        with self._lock:
+            entry = self._entries.get(workspace_id)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(workspace_id)
+                return entry[2].copy()
+
+        ruta = self.path(workspace_id)
+        logger.info(f"Leyendo datos desde: {ruta}")
+        df = pd.read_csv(ruta, encoding="utf-8-sig", dtype=str).fillna("")
+        self._remember(workspace_id, version, df)
+        return df.copy()
+
+    def save(self, workspace_id, df):
+        """Persist workspace data and keep it in memory"""
+        ruta = self.path(workspace_id)
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        # Write to a temporary file and swap it in so readers in other
+        # workers never see a half-written CSV
+        tmp_path = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_csv(tmp_path, index=False)
+        # The rename keeps inode and mtime, so this is the version of our own
+        # write even if another worker replaces the file right after
+        version = _file_version(os.stat(tmp_path))
+        os.replace(tmp_path, ruta)
+        logger.info(f"Datos guardados en {ruta}")
+
+        # Keep the same shape load() would return (everything as text)
+        cached = df.fillna("").astype(str).reset_index(drop=True)
+        self._remember(workspace_id, version, cached)
+
+        # Sweep old workspaces at most once an hour
+        if time.time() - self._last_purge > 3600:
+            self.purge_expired()
+
+    def purge_expired(self):
+        """Delete workspaces (and leftover temporary files) older than the retention"""
+        self._last_purge = time.time()
+        limite = self._last_purge - self.retention
+        try:
+            nombres = os.listdir(self.data_dir)
+        except OSError:
+            return
+
+        borrados = 0
+        for nombre in nombres:
+            # Never touch files the store did not create
+            match = _WORKSPACE_FILE_RE.match(nombre)
+            if not match:
+                continue
+            ruta = os.path.join(self.data_dir, nombre)
+            try:
+                if os.stat(ruta).st_mtime >= limite:
+                    continue
+                os.remove(ruta)
+            except OSError:
+                continue
+            borrados += 1
+            if match.group(2):
+                continue
+            with self._lock:
+                entry = self._entries.pop(match.group(1), None)
+                if entry:
+                    self._used -= entry[1]
+        if borrados:
+            logger.info(f"Eliminados {borrados} espacios de trabajo caducados")
+
+    def memory_usage(self):
+        """Bytes currently held in memory"""
+        with self._lock:
+            return self._used
+
+    def _remember(self, workspace_id, version, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            old = self._entries.pop(workspace_id, None)
+            if old:
+                self._used -= old[1]
+            self._entries[workspace_id] = (version, size, df)
+            self._used += size
+
+            # Evict idle workspaces (LRU) until we are back under budget.
+            # The one just touched always stays, even if it alone exceeds it.
+            while self._used > self.memory_budget and len(self._entries) > 1:
+                evicted_id, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._used -= evicted_size
+                logger.info(f"Espacio de trabajo {evicted_id} descargado de memoria ({evicted_size} bytes)")
+
+def init_app(app):
+    """Attach a workspace store to the application"""
+    store = WorkspaceStore(
+        app.config["WORKSPACE_DIR"],
+        app.config["WORKSPACE_MEMORY_BUDGET"],
+        app.config["WORKSPACE_RETENTION_DAYS"] * 24 * 3600
+    )
+    store.purge_expired()
+    app.extensions["workspaces"] = store
+
+def get_store():
+    """Workspace store of the current application"""
+    return current_app.extensions["workspaces"]
+
+def current_workspace_id():
+    """Workspace id of the current session, creating one if needed"""
+    workspace_id = session.get("workspace_id")
+    if not workspace_id or not _WORKSPACE_ID_RE.match(str(workspace_id)):
+        workspace_id = uuid.uuid4().hex
+        session["workspace_id"] = workspace_id
+    return workspace_id
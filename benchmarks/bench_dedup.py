@@ -0,0 +1,92 @@
+# benchmarks/bench_dedup.py - Benchmark for duplicate-subscriber detection
+import os
+import random
+import sys
+import time
+import pandas as pd
+
+# Asegurarse de que la raíz del proyecto está en el path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+from app.data_processor import find_duplicates
+
+NOMBRES = ["Ana", "Luis", "María", "José", "Carmen", "Javier", "Lucía", "Pablo", "Elena", "Sergio"]
+APELLIDOS = ["García", "Fernández", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Ruiz", "Díaz", "Moreno"]
+CALLES = ["Cigarral", "Atocha", "Alcalá", "Mayor", "Sol", "Luna", "Princesa", "Toledo", "Segovia", "Bravo Murillo"]
+TIPOS = [("Calle", ["C/", "C.", "Cl."]), ("Avenida", ["Avda.", "Av."]), ("Plaza", ["Pza.", "Pl."]),
+         ("Ronda", ["Rda."]), ("Paseo", ["Pso.", "P."])]
+
+def _variante_nombre(rng, nombre, apellido1, apellido2):
+    """Same person written differently: initial, one surname, no accents"""
+    forma = rng.choice(["inicial", "un_apellido", "mayusculas"])
+    if forma == "inicial":
+        return f"{nombre[0]}. {apellido1} {apellido2}"
+    if forma == "un_apellido":
+        return f"{nombre} {apellido1}"
+    return f"{nombre} {apellido1} {apellido2}".upper().translate(str.maketrans("ÁÉÍÓÚ", "AEIOU"))
+
+def _fila(rng, persona):
+    tipo, abreviaturas = rng.choice(TIPOS)
+    nombre, apellido1, apellido2 = rng.choice(NOMBRES), rng.choice(APELLIDOS), rng.choice(APELLIDOS)
+    calle, numero, piso, puerta = rng.choice(CALLES), rng.randint(1, 200), rng.randint(1, 9), rng.choice("ABCDP")
+    fila = {
+        "Nombre": f"{nombre} {apellido1} {apellido2}",
+        "Dirección": f"{tipo} {calle} {numero} {piso}{puerta}",
+        "CP": f"{rng.randint(1000, 52999):05d}",
+        "Ciudad": "Madrid",
+        "persona": persona
+    }
+    # La misma persona con otro formato, para reinsertarla como duplicado
+    puerta_variante = rng.choice([f"{piso}º{puerta}", f"{piso}º {puerta}", f"{piso} {puerta}"])
+    variante = dict(fila,
+                    Nombre=_variante_nombre(rng, nombre, apellido1, apellido2),
+                    Dirección=f"{rng.choice(abreviaturas)} {calle} {numero}, {puerta_variante}")
+    return fila, variante
+
+def _familiar(rng, fila, persona):
+    """Another person at the same door sharing both surnames (not a duplicate)"""
+    nombre = fila["Nombre"].split(" ", 1)[0]
+    otro = rng.choice([n for n in NOMBRES if n[0] != nombre[0]])
+    return dict(fila, Nombre=otro + " " + fila["Nombre"].split(" ", 1)[1], persona=persona)
+
+def generar_datos(n, ratio_duplicados=0.05, ratio_familiares=0.02, seed=42):
+    """Synthetic subscribers with reformatted duplicates and same-door relatives"""
+    rng = random.Random(seed)
+    n_duplicados = int(n * ratio_duplicados)
+    n_familiares = int(n * ratio_familiares)
+    n_personas = n - n_duplicados - n_familiares
+    pares = [_fila(rng, persona) for persona in range(n_personas)]
+    filas = [fila for fila, _ in pares] + [variante for _, variante in rng.sample(pares, n_duplicados)]
+    filas += [_familiar(rng, fila, n_personas + i) for i, (fila, _) in enumerate(rng.sample(pares, n_familiares))]
+    rng.shuffle(filas)
+    return pd.DataFrame(filas)
+
+def evaluar(df, duplicados):
+    """Precision and recall: a flag is right if the same person appeared earlier"""
+    vistas = set()
+    verdaderos = esperados = marcados = 0
+    for persona, duplicado in zip(df["persona"], duplicados):
+        repetida = persona in vistas
+        vistas.add(persona)
+        esperados += repetida
+        marcados += bool(duplicado)
+        verdaderos += repetida and bool(duplicado)
+    precision = verdaderos / marcados if marcados else 1.0
+    recall = verdaderos / esperados if esperados else 1.0
+    return precision, recall, marcados - verdaderos
+
+def main():
+    for n in (12500, 25000, 50000):
+        df = generar_datos(n)
+        inicio = time.perf_counter()
+        duplicados = find_duplicates(df)
+        segundos = time.perf_counter() - inicio
+        precision, recall, falsos = evaluar(df, duplicados)
+        # Relatives at the same door are the hard negatives behind precision
+        print(f"{n:>6} filas: {segundos:.3f} s ({n / segundos:,.0f} filas/s), "
+              f"precisión {precision:.3f}, recall {recall:.3f} ({falsos} falsos positivos)")
+
+if __name__ == "__main__":
+    main()
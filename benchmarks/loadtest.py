@@ -0,0 +1,317 @@
+# benchmarks/loadtest.py - Load test with concurrent operators against gunicorn
+"""
+Starts a stand-in Google Sheets server that serves synthetic sheets at
+/spreadsheets/d/<id>/export?format=csv, launches the app under gunicorn with N
+workers pointing SHEETS_BASE_URL at it, and runs concurrent operators through a
+mixed workload (sheet import, /editar bursts, calibration-driven /etiquetas.pdf
+refreshes, /etiquetas_or.pdf downloads).
+
+Reports latency percentiles, throughput and error rate per endpoint, plus the
+RSS of every gunicorn worker over time (read from /proc, so Linux only).
+
+    python benchmarks/loadtest.py --workers 4 --operators 20 --duration 60
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+import requests
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NOMBRES = ["Ana", "Luis", "María", "José", "Carmen", "Javier", "Lucía", "Pablo", "Elena", "Sergio"]
+APELLIDOS = ["García", "Fernández", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Ruiz", "Díaz", "Moreno"]
+CALLES = ["C/ Cigarral", "Calle Atocha", "Avda. de América", "Pza. Mayor", "Rda. de Segovia", "Paseo del Prado"]
+COLUMNAS = ["Nombre y apellidos", "Empresa", "Dirección", "CP", "Ciudad", "Zona", "Envío", "País", "Internacional"]
+
+def synthetic_rows(sheet_id, rows):
+    """Deterministic subscribers for a sheet id (same id, same rows)"""
+    rng = random.Random(sheet_id)
+    filas = []
+    for _ in range(rows):
+        internacional = rng.random() < 0.1
+        filas.append({
+            "Nombre y apellidos": f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}",
+            "Empresa": "Librería Salvaje" if rng.random() < 0.1 else "",
+            "Dirección": f"{rng.choice(CALLES)} {rng.randint(1, 200)}, {rng.randint(1, 9)}º{rng.choice('ABCD')}",
+            "CP": f"{rng.randint(1000, 52999):05d}",
+            "Ciudad": "Madrid",
+            "Zona": str(rng.randint(1, 400)),
+            "Envío": str(rng.randint(1, 3)),
+            "País": "Francia" if internacional else "",
+            "Internacional": "sí" if internacional else "no"
+        })
+    return filas
+
+def edit_payload(sheet_id, rows, rng):
+    """/editar body built from the same synthetic rows, with some toggled"""
+    data = []
+    for fila in synthetic_rows(sheet_id, rows):
+        data.append({
+            "Enviar": rng.random() > 0.1,
+            "Nombre": fila["Nombre y apellidos"],
+            "Empresa": fila["Empresa"],
+            "Dirección": fila["Dirección"],
+            "CP": fila["CP"],
+            "Ciudad": fila["Ciudad"],
+            "Zona": fila["Zona"],
+            "Producto": fila["Envío"],
+            "País": fila["País"],
+            "Internacional": fila["Internacional"] == "sí"
+        })
+    return {"data": data}
+
+def start_sheets_server(port, rows, latency):
+    """Stand-in for docs.google.com CSV export"""
+
+    class SheetsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if len(parts) != 4 or parts[:2] != ["spreadsheets", "d"] or parts[3] != "export":
+                self.send_error(404)
+                return
+            if latency:
+                time.sleep(latency)
+            buffer = StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=COLUMNAS)
+            writer.writeheader()
+            writer.writerows(synthetic_rows(parts[2], rows))
+            body = buffer.getvalue().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), SheetsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_gunicorn(workers, port, sheets_url, workspace_dir, log, extra_args):
+    """Run the app under gunicorn, logging to the given open file"""
+    env = dict(os.environ, SHEETS_BASE_URL=sheets_url, WORKSPACE_DIR=workspace_dir)
+    cmd = [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}"] + extra_args + ["main:app"]
+    proc = subprocess.Popen(cmd, cwd=root_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn terminó con código {proc.returncode}, ver {log.name}")
+        try:
+            requests.get(base + "/", timeout=1)
+            return proc, base
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    stop_gunicorn(proc)
+    raise RuntimeError(f"gunicorn no respondió en 30 s, ver {log.name}")
+
+def stop_gunicorn(proc):
+    """Stop gunicorn gracefully, killing it if it does not exit in time"""
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+def _worker_pids(master_pid):
+    try:
+        with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+            return [int(pid) for pid in f.read().split()]
+    except OSError:
+        return []
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+class Recorder:
+    """Thread-safe collection of request results"""
+
+    def __init__(self):
+        self.results = []  # (endpoint, latency seconds, ok)
+        self._lock = threading.Lock()
+
+    def call(self, endpoint, func, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            response = func(*args, **kwargs)
+            ok = response.status_code < 400
+            if ok and endpoint == "/editar":
+                ok = response.json().get("ok", False)
+            elif ok and endpoint == "/":
+                ok = "Error al procesar la hoja" not in response.text
+        except (requests.exceptions.RequestException, ValueError):
+            ok = False
+        with self._lock:
+            self.results.append((endpoint, time.perf_counter() - inicio, ok))
+
+def operator(base, recorder, stop, args, seed):
+    """One operator preparing a mailing: import, edit, calibrate, download"""
+    rng = random.Random(seed)
+    session = requests.Session()
+    timeout = args.timeout
+
+    def importar():
+        sheet_id = f"loadtest{rng.randint(0, args.sheets - 1)}"
+        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/edit"
+        recorder.call("/", session.post, base + "/", data={"sheet_url": url}, timeout=timeout)
+        return sheet_id
+
+    sheet_id = importar()
+    while not stop.is_set():
+        accion = rng.choices(["editar", "calibrar", "or", "importar"], weights=args.mix)[0]
+        if accion == "editar":
+            for _ in range(rng.randint(1, args.burst)):
+                recorder.call("/editar", session.post, base + "/editar",
+                              json=edit_payload(sheet_id, args.rows, rng), timeout=timeout)
+        elif accion == "calibrar":
+            # Dragging a calibration control fires several refreshes in a row
+            params = {"offset_x": 0, "offset_y": 0, "delta_w": 0, "delta_h": 0, "guides": rng.choice(["0", "1"])}
+            campo = rng.choice(["offset_x", "offset_y", "delta_w", "delta_h"])
+            for paso in range(rng.randint(1, args.burst)):
+                params[campo] = round(paso * 0.5, 1)
+                recorder.call("/etiquetas.pdf", session.get, base + "/etiquetas.pdf", params=params, timeout=timeout)
+        elif accion == "or":
+            recorder.call("/etiquetas_or.pdf", session.get, base + "/etiquetas_or.pdf", timeout=timeout)
+        else:
+            sheet_id = importar()
+        if args.think:
+            stop.wait(rng.uniform(0, 2 * args.think))
+
+def _percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+def summarize(results, elapsed):
+    """Latency percentiles (ms), throughput and error rate per endpoint"""
+    resumen = {}
+    endpoints = sorted({endpoint for endpoint, _, _ in results}) + ["TOTAL"]
+    for endpoint in endpoints:
+        filas = [r for r in results if endpoint == "TOTAL" or r[0] == endpoint]
+        latencias = [latency * 1000 for _, latency, _ in filas]
+        errores = sum(1 for _, _, ok in filas if not ok)
+        resumen[endpoint] = {
+            "requests": len(filas),
+            "rps": len(filas) / elapsed if elapsed else 0.0,
+            "error_rate": errores / len(filas) if filas else 0.0,
+            "p50_ms": _percentile(latencias, 50),
+            "p90_ms": _percentile(latencias, 90),
+            "p99_ms": _percentile(latencias, 99),
+            "max_ms": max(latencias, default=0.0)
+        }
+    return resumen
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test with concurrent operators")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--operators", type=int, default=10, help="concurrent operators (sessions)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--rows", type=int, default=300, help="rows per synthetic sheet")
+    parser.add_argument("--sheets", type=int, default=5, help="distinct synthetic sheets")
+    parser.add_argument("--sheets-latency", type=float, default=0.0, help="seconds the stand-in waits per export")
+    parser.add_argument("--mix", type=float, nargs=4, default=[3, 5, 1, 1], metavar=("EDIT", "CALIB", "OR", "IMPORT"),
+                        help="weights of each action")
+    parser.add_argument("--burst", type=int, default=5, help="max requests per edit/calibration burst")
+    parser.add_argument("--think", type=float, default=0.2, help="mean pause between actions (s)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout (s)")
+    parser.add_argument("--sample", type=float, default=1.0, help="RSS sampling interval (s)")
+    parser.add_argument("--gunicorn-arg", action="append", default=[], help="extra gunicorn argument (repeatable)")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="salvaje-loadtest-")
+    sheets_port = _free_port()
+    sheets = start_sheets_server(sheets_port, args.rows, args.sheets_latency)
+    log_path = os.path.join(tmp_dir, "gunicorn.log")
+    log = open(log_path, "w")  # noqa: SIM115 - closed in the finally below
+    gunicorn = None
+    recorder = Recorder()
+    stop = threading.Event()
+    rss = []  # (t, {pid: MB})
+
+    def sample_rss(inicio):
+        while not stop.is_set():
+            rss.append((time.time() - inicio, {pid: _rss_mb(pid) for pid in _worker_pids(gunicorn.pid)}))
+            stop.wait(args.sample)
+
+    threads = []
+    try:
+        gunicorn, base = start_gunicorn(args.workers, _free_port(), f"http://127.0.0.1:{sheets_port}",
+                                        os.path.join(tmp_dir, "workspaces"), log, args.gunicorn_arg)
+        print(f"App en {base} ({args.workers} workers), hojas en :{sheets_port}, log en {log_path}")
+
+        inicio = time.time()
+        threads = [threading.Thread(target=sample_rss, args=(inicio,), daemon=True)]
+        threads += [threading.Thread(target=operator, args=(base, recorder, stop, args, i), daemon=True)
+                    for i in range(args.operators)]
+        for t in threads:
+            t.start()
+        stop.wait(args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for t in threads:
+            t.join(args.timeout)
+        elapsed = time.time() - inicio if threads else 0.0
+        if gunicorn:
+            stop_gunicorn(gunicorn)
+        sheets.shutdown()
+        log.close()
+
+    resumen = summarize(list(recorder.results), elapsed)
+    print(f"\n{'endpoint':<20}{'reqs':>8}{'req/s':>9}{'err %':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for endpoint, r in resumen.items():
+        print(f"{endpoint:<20}{r['requests']:>8}{r['rps']:>9.1f}{r['error_rate'] * 100:>8.1f}"
+              f"{r['p50_ms']:>10.0f}{r['p90_ms']:>10.0f}{r['p99_ms']:>10.0f}{r['max_ms']:>10.0f}")
+
+    pids = sorted({pid for _, muestra in rss for pid in muestra})
+    print("\nRSS por worker (MB)")
+    print(f"{'t (s)':>7}" + "".join(f"{pid:>10}" for pid in pids))
+    paso = max(1, len(rss) // 20)
+    muestras = rss[::paso]
+    if rss and muestras[-1] is not rss[-1]:
+        muestras.append(rss[-1])
+    for t, muestra in muestras:
+        celdas = [muestra.get(pid) for pid in pids]
+        print(f"{t:>7.1f}" + "".join(f"{c:>10.1f}" if c is not None else f"{'-':>10}" for c in celdas))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "elapsed": elapsed, "endpoints": resumen,
+                       "rss_mb": [{"t": t, "workers": muestra} for t, muestra in rss]}, f, indent=2)
+        print(f"\nInforme guardado en {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# tests/test_data_processor.py - Tests for duplicate-subscriber detection
+import pandas as pd
+import pytest
+
+from app.data_processor import _names_match, find_duplicates
+from app.utils import normalize_name
+
+
+def _duplicados(filas):
+    df = pd.DataFrame(filas, columns=["Nombre", "Dirección", "CP"])
+    return [bool(d) for d in find_duplicates(df)]
+
+
+@pytest.mark.parametrize("nombre_a, nombre_b, esperado", [
+    ("Ana García López", "Ana Garcia Lopez", True),
+    ("Ana García López", "A. García López", True),
+    ("Ana García López", "Ana García", True),
+    ("Ana García López", "Luis García López", False),
+    ("Ana García López", "Ana Pérez Ruiz", False),
+])
+def test_names_match(nombre_a, nombre_b, esperado):
+    tokens_a = normalize_name(nombre_a).split()
+    tokens_b = normalize_name(nombre_b).split()
+    assert _names_match(tokens_a, tokens_b) is esperado
+    assert _names_match(tokens_b, tokens_a) is esperado
+
+
+@pytest.mark.parametrize("filas, esperado", [
+    # Request example: same person, address reformatted, same CP
+    ([("Ana García", "C/ Cigarral 2, 3ºA", "28001"),
+      ("Ana García", "Calle Cigarral 2 3A", "28001")], [False, True]),
+    # Same address in a different CP
+    ([("Ana García", "C/ Cigarral 2, 3ºA", "28001"),
+      ("Ana García", "Calle Cigarral 2 3A", "28002")], [False, False]),
+    # Initial vs full first name
+    ([("Ana García López", "C/ Mayor 3 2C", "28001"),
+      ("A. García López", "Calle Mayor 3, 2º C", "28001")], [False, True]),
+    # Siblings sharing both surnames at the same door
+    ([("Ana García López", "C/ Mayor 3, 2ºA", "28001"),
+      ("Luis García López", "C/ Mayor 3, 2ºA", "28001")], [False, False]),
+    # Same name, different street in the same CP
+    ([("Juan Pérez", "C/ Sol 1", "28001"),
+      ("Juan Pérez", "Avda. Luna 99", "28001")], [False, False]),
+    # Same name, same building, different door
+    ([("María Ruiz", "C/ Sol 1, 1ºB", "28001"),
+      ("María Ruiz", "C/ Sol 1, 4ºD", "28001")], [False, False]),
+    # Door missing in one of the rows
+    ([("María Ruiz", "C/ Sol 1, 1ºB", "28001"),
+      ("María Ruiz", "Calle Sol 1", "28001")], [False, True]),
+    # Empty CP: rows without CP are only compared among themselves
+    ([("Ana García", "C/ Cigarral 2, 3ºA", ""),
+      ("Ana García", "Calle Cigarral 2 3A", ""),
+      ("Ana García", "Calle Cigarral 2 3A", "28001")], [False, True, False]),
+])
+def test_find_duplicates(filas, esperado):
+    assert _duplicados(filas) == esperado
@@ -0,0 +1,24 @@
+# tests/test_utils.py - Tests for utility functions
+import pytest
+
+from app.utils import normalize_address
+
+
+@pytest.mark.parametrize("puerta", ["A", "B", "C", "D", "P"])
+def test_normalize_address_keeps_door_letters(puerta):
+    esperado = f"calle mayor 3 2{puerta.lower()}"
+    assert normalize_address(f"Calle Mayor 3, 2º {puerta}") == esperado
+    assert normalize_address(f"C/ Mayor 3 2{puerta}") == esperado
+    assert normalize_address(f"C. Mayor 3, 2º{puerta}") == esperado
+
+
+@pytest.mark.parametrize("direccion, esperado", [
+    ("C/ Cigarral 2, 3ºA", "calle cigarral 2 3a"),
+    ("Calle Cigarral 2 3A", "calle cigarral 2 3a"),
+    ("Pso. Sol 4, 1ºP", "paseo sol 4 1p"),
+    ("P. Sol 4 1P", "paseo sol 4 1p"),
+    ("Avda. de la Paz nº 4, 2º izda", "avenida paz 4 2 izquierda"),
+    ("C/ P. Picasso 3", "calle p picasso 3"),
+])
+def test_normalize_address_folds_street_types(direccion, esperado):
+    assert normalize_address(direccion) == esperado
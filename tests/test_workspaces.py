@@ -0,0 +1,123 @@
+# tests/test_workspaces.py - Tests for per-session dataset storage
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from app import create_app
+from app.workspaces import WorkspaceStore
+
+ID_A, ID_B, ID_C = "a" * 32, "b" * 32, "c" * 32
+FILA = {"Enviar": True, "Nombre": "Ana García", "Dirección": "C/ Sol 1", "CP": "28001",
+        "Ciudad": "Madrid", "Zona": "1", "Producto": "2"}
+
+
+def _datos(nombre, filas=20):
+    return pd.DataFrame([dict(FILA, Nombre=f"{nombre} {i}") for i in range(filas)])
+
+
+def _envejecer(ruta, dias):
+    t = time.time() - dias * 24 * 3600
+    os.utime(ruta, (t, t))
+
+
+def test_lru_eviction_under_budget(tmp_path):
+    tamano = int(_datos("x").astype(str).memory_usage(index=True, deep=True).sum())
+    store = WorkspaceStore(str(tmp_path), int(tamano * 2.5), 3600)
+    for workspace_id in (ID_A, ID_B, ID_C):
+        store.save(workspace_id, _datos(workspace_id))
+    assert list(store._entries) == [ID_B, ID_C]
+    assert store.memory_usage() <= store.memory_budget
+
+    # Touching B makes C the least recently used
+    store.load(ID_B)
+    store.save(ID_A, _datos(ID_A))
+    assert list(store._entries) == [ID_B, ID_A]
+
+
+def test_reload_after_eviction(tmp_path):
+    store = WorkspaceStore(str(tmp_path), 1, 3600)
+    store.save(ID_A, _datos("Ana"))
+    store.save(ID_B, _datos("Luis"))
+    assert ID_A not in store._entries
+
+    df = store.load(ID_A)
+    assert df["Nombre"].tolist() == [f"Ana {i}" for i in range(20)]
+    assert df["Enviar"].tolist() == ["True"] * 20
+
+
+def test_workers_see_each_others_writes(tmp_path):
+    # Two stores on one directory stand in for two gunicorn workers
+    worker_1 = WorkspaceStore(str(tmp_path), 10**8, 3600)
+    worker_2 = WorkspaceStore(str(tmp_path), 10**8, 3600)
+    for i in range(20):
+        escritor, lector = (worker_1, worker_2) if i % 2 else (worker_2, worker_1)
+        escritor.save(ID_A, _datos(f"v{i}", filas=1))
+        assert lector.load(ID_A)["Nombre"].tolist() == [f"v{i} 0"]
+        assert lector.version(ID_A) == escritor.version(ID_A)
+
+
+def test_write_in_the_same_clock_tick_is_seen(tmp_path):
+    worker_1 = WorkspaceStore(str(tmp_path), 10**8, 3600)
+    worker_2 = WorkspaceStore(str(tmp_path), 10**8, 3600)
+    worker_1.save(ID_A, _datos("v1", filas=1))
+    assert worker_2.load(ID_A)["Nombre"].tolist() == ["v1 0"]
+    mtime = os.stat(worker_1.path(ID_A)).st_mtime_ns
+
+    # Same size and, as if written in the same tick, the same mtime
+    worker_1.save(ID_A, _datos("v2", filas=1))
+    os.utime(worker_1.path(ID_A), ns=(mtime, mtime))
+    assert worker_2.load(ID_A)["Nombre"].tolist() == ["v2 0"]
+
+
+def test_load_missing_workspace(tmp_path):
+    store = WorkspaceStore(str(tmp_path), 10**8, 3600)
+    assert store.version(ID_A) == 0
+    with pytest.raises(FileNotFoundError):
+        store.load(ID_A)
+    with pytest.raises(ValueError):
+        store.path("../datos_hoja")
+
+
+def test_retention_sweep_only_removes_old_workspace_files(tmp_path):
+    store = WorkspaceStore(str(tmp_path), 10**8, 7 * 24 * 3600)
+    store.save(ID_A, _datos("Ana"))
+    store.save(ID_B, _datos("Luis"))
+    viejo_tmp = tmp_path / f"{ID_C}.csv.123.456.tmp"
+    viejo_tmp.write_text("x")
+    ajeno = tmp_path / "datos_hoja.csv"
+    ajeno.write_text("x")
+    for ruta in (tmp_path / f"{ID_A}.csv", viejo_tmp, ajeno):
+        _envejecer(ruta, 8)
+
+    store.purge_expired()
+
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{ID_B}.csv", "datos_hoja.csv"])
+    assert ID_A not in store._entries
+    with pytest.raises(FileNotFoundError):
+        store.load(ID_A)
+
+
+def test_sessions_get_separate_workspaces(tmp_path):
+    app = create_app({"TESTING": True, "WORKSPACE_DIR": str(tmp_path)})
+    operador_1, operador_2 = app.test_client(), app.test_client()
+
+    datos_1 = {"data": [dict(FILA, Nombre="Ana")]}
+    datos_2 = {"data": [dict(FILA, Nombre="Luis")] * 2}
+    assert operador_1.post("/editar", json=datos_1).json["ok"]
+    assert operador_2.post("/editar", json=datos_2).json["ok"]
+    assert operador_1.get("/etiquetas.pdf").status_code == 200
+    assert operador_2.get("/etiquetas.pdf").status_code == 200
+    # A session that never loaded data has nothing to print
+    assert app.test_client().get("/etiquetas.pdf").status_code == 500
+
+    ids = []
+    for operador in (operador_1, operador_2):
+        with operador.session_transaction() as sesion:
+            ids.append(sesion["workspace_id"])
+    assert ids[0] != ids[1]
+
+    store = app.extensions["workspaces"]
+    assert store.load(ids[0])["Nombre"].tolist() == ["Ana"]
+    assert store.load(ids[1])["Nombre"].tolist() == ["Luis", "Luis"]